@@ -0,0 +1,233 @@
+"""
+Compare the buffered and the streamed eth_getBlockByNumber responses.
+
+Requests go through the actual FastAPI app, backed by a fake Starknet node
+serving a block of the given size. Each mode runs in its own process so that the
+reported peak RSS is not polluted by the other one, and the RSS baseline is taken
+before the block is fetched:
+
+    python benchmarks/block_streaming.py --transactions 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+
+def get_block(n_transactions: int, calldata_len: int, transactions: bool) -> dict:
+    return {
+        "status": "ACCEPTED_ON_L2",
+        "block_hash": "0x1",
+        "parent_hash": "0x0",
+        "block_number": 1,
+        "new_root": "0x0",
+        "timestamp": 0,
+        "sequencer_address": "0x0",
+        "transactions": [
+            {
+                "type": "INVOKE",
+                "transaction_hash": hex(i),
+                "version": "0x1",
+                "max_fee": hex(int(1e17)),
+                "signature": [hex(i), hex(i)],
+                "nonce": hex(i),
+                "sender_address": hex(i + 1),
+                "calldata": [hex(j) for j in range(calldata_len)],
+            }
+            if transactions
+            else hex(i)
+            for i in range(n_transactions)
+        ],
+    }
+
+
+def serve_node(port: int, n_transactions: int, calldata_len: int):
+    from aiohttp import web
+
+    results = {
+        "starknet_getBlockWithTxs": json.dumps(
+            get_block(n_transactions, calldata_len, True)
+        ),
+        "starknet_getBlockWithTxHashes": json.dumps(
+            get_block(n_transactions, calldata_len, False)
+        ),
+    }
+
+    def reply(request: dict) -> str:
+        return f'{{"jsonrpc":"2.0","id":{request["id"]},"result":{results[request["method"]]}}}'
+
+    async def handler(request):
+        body = await request.json()
+        if isinstance(body, list):
+            text = "[" + ",".join(reply(r) for r in body) + "]"
+        else:
+            text = reply(body)
+        return web.Response(text=text, content_type="application/json")
+
+    app = web.Application(client_max_size=2**30)
+    app.router.add_post("/", handler)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+async def request_block(app, transactions: bool):
+    body = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "method": "eth_getBlockByNumber",
+            "params": ["0x1", transactions],
+            "id": 0,
+        }
+    ).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 8000),
+    }
+    done = asyncio.Event()
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    stats = {"size": 0, "time_to_first_byte": None}
+    start = time.perf_counter()
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            if stats["time_to_first_byte"] is None:
+                stats["time_to_first_byte"] = time.perf_counter() - start
+            stats["size"] += len(message["body"])
+
+    await app(scope, receive, send)
+    done.set()
+    stats["total_time"] = time.perf_counter() - start
+    return stats
+
+
+def run(mode: str, node_url: str, transactions: bool):
+    os.environ.update(
+        {
+            "STARKNET_NETWORK": "sharingan",
+            "SHARINGAN_RPC_URL": node_url,
+            "KAKAROT_ADDRESS": "0x1",
+            "ACCOUNT_ADDRESS": "0x1",
+            "PRIVATE_KEY": "0x1",
+            "STREAMING_MIN_TRANSACTIONS": "1" if mode == "streamed" else str(2**62),
+        }
+    )
+    from ethjsonrpc.main import app
+
+    async def main():
+        await app.router.startup()
+        baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        stats = await request_block(app, transactions)
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        await app.router.shutdown()
+        return {
+            "mode": mode,
+            "size_mb": stats["size"] / 1e6,
+            "ttfb_ms": stats["time_to_first_byte"] * 1e3,
+            "total_ms": stats["total_time"] * 1e3,
+            # ru_maxrss is in KiB on linux
+            "peak_rss_increase_mb": (peak_rss - baseline_rss) / 1024,
+        }
+
+    print(json.dumps(asyncio.run(main())))
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"Fake node not listening on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=20_000)
+    parser.add_argument("--calldata-len", type=int, default=64)
+    parser.add_argument("--hashes-only", action="store_true")
+    parser.add_argument("--mode", choices=["buffered", "streamed"])
+    parser.add_argument("--node-url")
+    parser.add_argument("--serve-node", type=int, metavar="PORT")
+    args = parser.parse_args()
+
+    if args.serve_node is not None:
+        serve_node(args.serve_node, args.transactions, args.calldata_len)
+        return
+
+    if args.mode is not None:
+        run(args.mode, args.node_url, not args.hashes_only)
+        return
+
+    port = get_free_port()
+    node = subprocess.Popen(
+        [
+            sys.executable,
+            __file__,
+            "--serve-node",
+            str(port),
+            "--transactions",
+            str(args.transactions),
+            "--calldata-len",
+            str(args.calldata_len),
+        ]
+    )
+    try:
+        wait_for_port(port)
+        for mode in ["buffered", "streamed"]:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--mode",
+                    mode,
+                    "--node-url",
+                    f"http://127.0.0.1:{port}",
+                ]
+                + (["--hashes-only"] if args.hashes_only else []),
+                stdout=subprocess.PIPE,
+                check=True,
+                text=True,
+            ).stdout
+            stats = json.loads(output.splitlines()[-1])
+            print(
+                f"{stats['mode']: <9} size={stats['size_mb']:.1f}MB "
+                f"ttfb={stats['ttfb_ms']:.1f}ms total={stats['total_ms']:.1f}ms "
+                f"peak_rss_increase={stats['peak_rss_increase_mb']:.1f}MB"
+            )
+    finally:
+        node.terminate()
+        node.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+import aiohttp
+from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.http_client import HttpMethod, RpcHttpClient, ServerError
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingRpcHttpClient(RpcHttpClient):
+    """
+    RpcHttpClient sending the calls issued within a short window as a single
+    JSON-RPC batch request.
+
+    The first call of a batch arms a timer of `window` seconds; the batch is sent
+    when the timer fires or as soon as it holds `max_batch_size` calls. Replies
+    are matched back to their callers using the request ids. If the node rejects
+    batch requests, the calls are sent one by one from then on.
+    """
+
+    def __init__(
+        self,
+        url,
+        session: Optional[aiohttp.ClientSession] = None,
+        window: float = 0.002,
+        max_batch_size: int = 100,
+    ):
+        super().__init__(url=url, session=session)
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batching = True
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def call(self, method_name: str, params: dict) -> dict:
+        if not self.batching:
+            return await super().call(method_name=method_name, params=params)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(
+            (
+                {
+                    "jsonrpc": "2.0",
+                    "method": f"starknet_{method_name}",
+                    "params": params,
+                },
+                future,
+            )
+        )
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Keep a reference to the task so that it's not garbage collected
+        task = asyncio.ensure_future(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[dict, asyncio.Future]]):
+        payload = [{**request, "id": i} for i, (request, _) in enumerate(batch)]
+        try:
+            response = await self.request(
+                http_method=HttpMethod.POST,
+                address=self.url,
+                # No need to wrap a lonely call into a batch
+                payload=payload if len(payload) > 1 else payload[0],
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if len(payload) > 1 and not isinstance(response, list):
+            # Nodes without batch support answer with a single error object,
+            # e.g. {"id": null, "error": ...}: resend the calls one by one
+            logger.warning("⚠️  Starknet node rejected a batch request: %s", response)
+            self.batching = False
+            await asyncio.gather(*[self._send([call]) for call in batch])
+            return
+
+        replies = {
+            reply.get("id"): reply
+            for reply in (response if isinstance(response, list) else [response])
+            if isinstance(reply, dict)
+        }
+        for i, (_, future) in enumerate(batch):
+            # The caller may have been cancelled in the meantime
+            if future.done():
+                continue
+            reply = replies.get(i)
+            if reply is None:
+                future.set_exception(ServerError(body=response))
+            elif "result" in reply:
+                future.set_result(reply["result"])
+            else:
+                try:
+                    self.handle_rpc_error(reply)
+                except Exception as e:
+                    future.set_exception(e)
+
+
+class BatchingFullNodeClient(FullNodeClient):
+    """
+    FullNodeClient whose upstream calls are grouped into JSON-RPC batch requests,
+    see BatchingRpcHttpClient.
+    """
+
+    def __init__(
+        self,
+        node_url: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        window: float = 0.002,
+        max_batch_size: int = 100,
+    ):
+        super().__init__(node_url=node_url, session=session)
+        self._client = BatchingRpcHttpClient(
+            url=node_url,
+            session=session,
+            window=window,
+            max_batch_size=max_batch_size,
+        )
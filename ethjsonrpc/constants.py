@@ -10,12 +10,27 @@ import requests
 from dotenv import load_dotenv
 from starknet_py.net.full_node_client import FullNodeClient
 
+from ethjsonrpc.batching import BatchingFullNodeClient
+
 load_dotenv()
 
 CHAIN_ID = int.from_bytes(b"KKRT", "big")
 ETH_TOKEN_ADDRESS = 0x49D36570D4E46F48E99674BD3FCC84644DDD6B96F7C741B1562B82F9E004DC7
 GAS_PRICE = int(1e9)
 PRIORITY_GAS_PRICE = GAS_PRICE * 10
+BLOCK_GAS_LIMIT = int(1e6)
+
+# eth_estimateGas stops its binary search once within this ratio of the result
+# and memoizes the estimates of the last ESTIMATE_GAS_CACHE_SIZE calls
+ESTIMATE_GAS_ERROR_RATIO = 0.015
+ESTIMATE_GAS_CACHE_SIZE = 1024
+
+# Process pool used to decode raw transactions and recover their sender
+# Defaults to the number of CPUs when not set
+TX_DECODER_MAX_WORKERS = int(os.getenv("TX_DECODER_MAX_WORKERS") or 0) or None
+
+# Blocks with at least this many transactions are streamed to the client
+STREAMING_MIN_TRANSACTIONS = int(os.getenv("STREAMING_MIN_TRANSACTIONS") or 256)
 
 
 class StarknetChainId(Enum):
@@ -65,7 +80,20 @@ RPC_URLS = {
     "katana": "http://127.0.0.1:5050",
     "madara": "http://127.0.0.1:9944",
 }
-RPC_CLIENT = FullNodeClient(node_url=RPC_URLS[NETWORK])
+
+# Upstream calls issued within RPC_BATCH_WINDOW_MS are sent as one JSON-RPC batch
+# of at most RPC_BATCH_MAX_SIZE calls, set either to 0 to disable batching
+RPC_BATCH_WINDOW_MS = float(os.getenv("RPC_BATCH_WINDOW_MS") or 2)
+RPC_BATCH_MAX_SIZE = int(os.getenv("RPC_BATCH_MAX_SIZE") or 100)
+RPC_CLIENT = (
+    BatchingFullNodeClient(
+        node_url=RPC_URLS[NETWORK],
+        window=RPC_BATCH_WINDOW_MS / 1000,
+        max_batch_size=RPC_BATCH_MAX_SIZE,
+    )
+    if RPC_BATCH_WINDOW_MS > 0 and RPC_BATCH_MAX_SIZE > 1
+    else FullNodeClient(node_url=RPC_URLS[NETWORK])
+)
 
 
 class ChainId(Enum):
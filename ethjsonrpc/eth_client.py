@@ -1,26 +1,34 @@
+import asyncio
 import logging
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import List, Union
 
-from eth.vm.forks.london.transactions import (
-    LondonLegacyTransaction,
-    LondonTypedTransaction,
-)
 from hexbytes import HexBytes
+from marshmallow import EXCLUDE, fields
 from starknet_py.contract import Contract
 from starknet_py.net.account.account import Account, _execute_payload_serializer
 from starknet_py.net.client_errors import ClientError
 from starknet_py.net.client_models import Call, Tag, TransactionStatus
-from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.full_node_client import FullNodeClient, get_block_identifier
+from starknet_py.net.schemas.common import Felt
+from starknet_py.net.schemas.rpc import StarknetBlockSchema
 from starknet_py.transaction_errors import TransactionNotReceivedError
 from starkware.starknet.public.abi import get_selector_from_name
 
 from ethjsonrpc.constants import (
+    BLOCK_GAS_LIMIT,
     CHAIN_ID,
+    ESTIMATE_GAS_CACHE_SIZE,
+    ESTIMATE_GAS_ERROR_RATIO,
     GAS_PRICE,
     KAKAROT_ADDRESS,
     PRIORITY_GAS_PRICE,
+    STREAMING_MIN_TRANSACTIONS,
+    TX_DECODER_MAX_WORKERS,
 )
+from ethjsonrpc.streaming import StreamedBlock
+from ethjsonrpc.tx_decoder import TransactionDecoder
 from ethjsonrpc.utils import (
     get_account,
     get_eth_contract,
@@ -32,19 +40,30 @@ logging.basicConfig()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# JSON-RPC error code of the node when the called contract fails
+CONTRACT_ERROR_CODE = 40
+
+
+class StarknetBlockWithTxHashesSchema(StarknetBlockSchema):
+    transactions = fields.List(Felt(), data_key="transactions", required=True)
+
 
 @dataclass
 class EthClient:
     rpc_client: FullNodeClient
     eth_contract: Contract
     kakarot_contract: Contract
+    tx_decoder: TransactionDecoder
+    # (block_hash, from, to, value, data, gas_limit) -> task, see eth_estimateGas
+    estimate_gas_cache: OrderedDict = field(default_factory=OrderedDict)
 
     @staticmethod
     async def new(rpc_client: FullNodeClient):
         rpc_account = get_account()
         eth_contract = await get_eth_contract(rpc_account)
         kakarot_contract = await get_kakarot_contract(rpc_account)
-        return EthClient(rpc_client, eth_contract, kakarot_contract)
+        tx_decoder = TransactionDecoder.new(max_workers=TX_DECODER_MAX_WORKERS)
+        return EthClient(rpc_client, eth_contract, kakarot_contract, tx_decoder)
 
     async def compute_starknet_address(self, evm_address: str):
         return (
@@ -72,7 +91,27 @@ class EthClient:
             await self.rpc_client.wait_for_tx(tx_hash)
         return get_account(starknet_address, "0xdead")
 
-    def starknet_block_to_eth_block(self, block, transactions: bool):
+    def starknet_block_to_eth_block(
+        self, block, transactions: bool
+    ) -> Union[dict, StreamedBlock]:
+        """
+        Large blocks are returned as a StreamedBlock, encoded chunk by chunk.
+        """
+        header = self.starknet_block_to_eth_block_header(block)
+        eth_transactions = self.iter_eth_block_transactions(block, transactions)
+        if len(block.transactions) >= STREAMING_MIN_TRANSACTIONS:
+            return StreamedBlock(header, eth_transactions)
+        return {
+            **header,
+            "transactions": list(
+                eth_transactions
+            ),  # Array - Array of transaction objects, or 32 Bytes transaction hashes depending on the last given parameter.
+        }
+
+    def starknet_block_to_eth_block_header(self, block):
+        """
+        Block fields except for the transactions, see iter_eth_block_transactions.
+        """
         return {
             "baseFeePerGas": "0x1",
             "number": block.block_number
@@ -91,18 +130,21 @@ class EthClient:
             "totalDifficulty": 0x0,  # QUANTITY - integer of the total difficulty of the chain until this block.
             "extraData": 0x0,  # DATA - the "extra data" field of this block.
             "size": 0x0,  # QUANTITY - integer the size of this block in bytes.
-            "gasLimit": int(1e6),  # QUANTITY - the maximum gas allowed in this block.
+            "gasLimit": BLOCK_GAS_LIMIT,  # QUANTITY - the maximum gas allowed in this block.
             "gasUsed": 0x0,  # QUANTITY - the total used gas by all transactions in this block.
             "timestamp": 0x0,  # QUANTITY - the unix timestamp for when the block was collated.
-            "transactions": [hex(t.hash) for t in block.transactions]
-            if not transactions
-            else block.transactions,  # Array - Array of transaction objects, or 32 Bytes transaction hashes depending on the last given parameter.
             "uncles": [],  # Array - Array of uncle hashes.
         }
 
-    @staticmethod
-    def is_legacy_tx(raw_tx: bytes):
-        return raw_tx[0] > 0xC0
+    def iter_eth_block_transactions(self, block, transactions: bool):
+        """
+        Lazily convert the block transactions so that large blocks can be streamed.
+
+        Without transactions, the block is expected to hold only the transaction
+        hashes, see get_block.
+        """
+        for t in block.transactions:
+            yield t if transactions else hex(t)
 
     @staticmethod
     def get_block_number(block_number: str) -> Union[Tag, int]:
@@ -173,12 +215,8 @@ class EthClient:
 
     async def eth_sendRawTransaction(self, raw_tx: str) -> str:
         tx = HexBytes(raw_tx)
-        is_legacy = self.is_legacy_tx(tx)
-        if is_legacy:
-            decoded_tx = LondonLegacyTransaction.decode(tx)
-        else:
-            decoded_tx = LondonTypedTransaction.decode(tx)
-        sender = decoded_tx.get_sender().hex()
+        decoded_tx = await self.tx_decoder.decode(tx)
+        sender = decoded_tx.sender.hex()
         eoa = await self.get_eoa(sender)
         call = Call(
             to_addr=0xDEAD,
@@ -195,39 +233,134 @@ class EthClient:
             )
         return f"0x{receipt.hash:064x}"
 
-    async def eth_call(self, tx, block_number) -> str:
-        block_hash = (
-            await self.rpc_client.get_block(
-                block_number=self.get_block_number(block_number)
+    async def get_block_hash(self, block_number: str) -> int:
+        # FullNodeClient.get_block fetches all the transactions of the block, only
+        # the hash is needed here
+        block_number = self.get_block_number(block_number)
+        if block_number == "latest":
+            block = await self.rpc_client._client.call(
+                method_name="blockHashAndNumber", params={}
             )
-        ).block_hash
-        return (
-            "0x"
-            + bytes(
-                (
-                    await self.kakarot_contract.functions["eth_call"]
-                    .prepare(
-                        to=int(tx.get("to", "0x0"), 16),
-                        gas_limit=int(tx.get("gas_limit", "0x0"), 16),
-                        gas_price=int(tx.get("gas_price", "0x0"), 16),
-                        value=int(tx.get("value", "0x0"), 16),
-                        data=HexBytes(tx["data"]),
-                    )
-                    .call(block_hash=hex(block_hash))
-                ).return_data
-            ).hex()
+        else:
+            block = await self.rpc_client._client.call(
+                method_name="getBlockWithTxHashes",
+                params=get_block_identifier(block_number=block_number),
+            )
+        return int(block["block_hash"], 16)
+
+    async def call_kakarot(self, tx, block_hash: int) -> bytes:
+        return bytes(
+            (
+                await self.kakarot_contract.functions["eth_call"]
+                .prepare(
+                    to=int(tx.get("to", "0x0"), 16),
+                    gas_limit=int(tx.get("gas_limit", "0x0"), 16),
+                    gas_price=int(tx.get("gas_price", "0x0"), 16),
+                    value=int(tx.get("value", "0x0"), 16),
+                    data=HexBytes(tx.get("data", "0x")),
+                )
+                .call(block_hash=hex(block_hash))
+            ).return_data
         )
 
-    async def eth_estimateGas(self, tx) -> str:
-        return hex(21_000)
+    async def eth_call(self, tx, block_number) -> str:
+        block_hash = await self.get_block_hash(block_number)
+        return "0x" + (await self.call_kakarot(tx, block_hash)).hex()
+
+    @staticmethod
+    def get_gas_cap(tx) -> int:
+        # As in geth, a missing or zero gas limit defaults to the block gas limit
+        return int(tx.get("gas_limit") or "0x0", 16) or BLOCK_GAS_LIMIT
+
+    async def estimate_gas(self, tx, block_hash: int) -> int:
+        """
+        Binary search the lowest gas limit for which the call succeeds.
+
+        The search stops once the bounds are within ESTIMATE_GAS_ERROR_RATIO of
+        each other, and the upper bound is returned.
+        """
+
+        async def succeeds(gas_limit: int) -> bool:
+            try:
+                await self.call_kakarot({**tx, "gas_limit": hex(gas_limit)}, block_hash)
+            except ClientError as e:
+                # Only an execution failure means that the gas limit is too low,
+                # other errors (e.g. HTTP 429 or 5xx from the node) abort the search
+                if e.code != CONTRACT_ERROR_CODE:
+                    raise
+                return False
+            return True
+
+        hi = self.get_gas_cap(tx)
+        if hi < 21_000:
+            raise ValueError(f"Gas limit {hi} is below the intrinsic gas 21000")
+        if not await succeeds(hi):
+            raise ValueError(f"Transaction fails with gas limit {hi}")
+        lo = 21_000 - 1
+        while (hi - lo) / hi > ESTIMATE_GAS_ERROR_RATIO and hi - lo > 1:
+            mid = (lo + hi) // 2
+            if await succeeds(mid):
+                hi = mid
+            else:
+                lo = mid
+        return hi
+
+    async def eth_estimateGas(self, tx, block_number="latest") -> str:
+        block_hash = await self.get_block_hash(block_number)
+        key = (
+            block_hash,
+            int(tx.get("from", "0x0"), 16),
+            int(tx.get("to", "0x0"), 16),
+            int(tx.get("value", "0x0"), 16),
+            HexBytes(tx.get("data", "0x")),
+            # The upper bound of the search, see estimate_gas
+            self.get_gas_cap(tx),
+        )
+        # Tasks are cached so that concurrent quotes share the same search
+        if key in self.estimate_gas_cache:
+            self.estimate_gas_cache.move_to_end(key)
+        else:
+            self.estimate_gas_cache[key] = asyncio.ensure_future(
+                self.estimate_gas(tx, block_hash)
+            )
+            if len(self.estimate_gas_cache) > ESTIMATE_GAS_CACHE_SIZE:
+                self.estimate_gas_cache.popitem(last=False)
+        task = self.estimate_gas_cache[key]
+        try:
+            return hex(await asyncio.shield(task))
+        except Exception:
+            # Don't memoize failures, the next quote retries
+            if self.estimate_gas_cache.get(key) is task:
+                del self.estimate_gas_cache[key]
+            raise
+
+    async def get_block(self, transactions: bool, block_hash=None, block_number=None):
+        """
+        Fetch a block with its full transactions, or only with their hashes.
+        """
+        if transactions:
+            return await self.rpc_client.get_block(
+                block_hash=block_hash, block_number=block_number
+            )
+        block = await self.rpc_client._client.call(
+            method_name="getBlockWithTxHashes",
+            params=get_block_identifier(
+                block_hash=block_hash, block_number=block_number
+            ),
+        )
+        return StarknetBlockWithTxHashesSchema().load(block, unknown=EXCLUDE)
 
-    async def eth_getBlockByHash(self, block_hash: str, transactions: bool) -> dict:
-        block = await self.rpc_client.get_block(block_hash=block_hash)
+    async def eth_getBlockByHash(
+        self, block_hash: str, transactions: bool
+    ) -> Union[dict, StreamedBlock]:
+        block = await self.get_block(transactions, block_hash=block_hash)
         return self.starknet_block_to_eth_block(block, transactions)
 
-    async def eth_getBlockByNumber(self, block_number: str, transactions: bool) -> dict:
-        block = await self.rpc_client.get_block(
-            block_number=self.get_block_number(block_number)
+    async def eth_getBlockByNumber(
+        self, block_number: str, transactions: bool
+    ) -> Union[dict, StreamedBlock]:
+        block = await self.get_block(
+            transactions, block_number=self.get_block_number(block_number)
         )
         return self.starknet_block_to_eth_block(block, transactions)
 
@@ -239,12 +372,10 @@ class EthClient:
         tx = bytes(
             _execute_payload_serializer.deserialize(starknet_tx.calldata).calldata
         )
-        is_legacy = self.is_legacy_tx(tx)
-        if is_legacy:
-            decoded_tx = LondonLegacyTransaction.decode(tx)
-        else:
-            decoded_tx = LondonTypedTransaction.decode(tx)
-        receipt = await self.rpc_client.get_transaction_receipt(tx_hash)
+        decoded_tx, receipt = await asyncio.gather(
+            self.tx_decoder.decode(tx),
+            self.rpc_client.get_transaction_receipt(tx_hash),
+        )
         contract_address = (
             hex(
                 [
@@ -263,7 +394,7 @@ class EthClient:
             "contractAddress": contract_address,
             "effectiveGasPrice": receipt.actual_fee,
             "cumulativeGasUsed": hex(21_000),
-            "from": "0x" + decoded_tx.get_sender().hex(),
+            "from": "0x" + decoded_tx.sender.hex(),
             "gasUsed": hex(21_000),
             "logs": [],
             "logsBloom": f"0x{0:0512}",
@@ -279,7 +410,7 @@ class EthClient:
             ),
             "to": "0x" + decoded_tx.to.hex(),
             "transactionIndex": "0x1",
-            "type": f"0x{0 if is_legacy else tx[0]}",
+            "type": f"0x{decoded_tx.type}",
         }
 
     async def eth_getCode(self, evm_address, block_number):
@@ -302,12 +433,10 @@ class EthClient:
         tx = bytes(
             _execute_payload_serializer.deserialize(starknet_tx.calldata).calldata
         )
-        is_legacy = self.is_legacy_tx(tx)
-        if is_legacy:
-            decoded_tx = LondonLegacyTransaction.decode(tx)
-        else:
-            decoded_tx = LondonTypedTransaction.decode(tx)
-        receipt = await self.rpc_client.get_transaction_receipt(tx_hash)
+        decoded_tx, receipt = await asyncio.gather(
+            self.tx_decoder.decode(tx),
+            self.rpc_client.get_transaction_receipt(tx_hash),
+        )
         return {
             "blockHash": hex(receipt.block_hash or 0),
             "blockNumber": hex(receipt.block_number or 0),
@@ -9,6 +9,7 @@ from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from starlette.concurrency import iterate_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -16,6 +17,7 @@ from starlette.requests import Request
 
 from ethjsonrpc.constants import NETWORK, RPC_CLIENT
 from ethjsonrpc.eth_client import EthClient
+from ethjsonrpc.streaming import StreamedBlock
 from ethjsonrpc.utils import chain_id
 
 load_dotenv()
@@ -101,10 +103,14 @@ class RequestContextLogMiddleware(BaseHTTPMiddleware):
 
         response = await call_next(request)
 
+        # Buffering the body to log it would defeat streamed responses
+        if not logger.isEnabledFor(logging.DEBUG):
+            return response
+
         try:
             response_body = [chunk async for chunk in response.body_iterator]
             response.body_iterator = iterate_in_threadpool(iter(response_body))
-            logger.debug(f"RPC response:\n\t{json.loads(response_body[0].decode())}")
+            logger.debug(f"RPC response:\n\t{json.loads(b''.join(response_body))}")
         except:
             logger.warning("Cannot parse response")
 
@@ -130,6 +136,11 @@ async def get_client():
     eth_client = await EthClient.new(RPC_CLIENT)
 
 
+@app.on_event("shutdown")
+async def close_client():
+    eth_client.tx_decoder.shutdown()
+
+
 class Payload(BaseModel):
     jsonrpc: str
     method: str
@@ -154,15 +165,23 @@ class MintResponse(BaseModel):
     unit: str
 
 
+RPC_METHOD_PREFIXES = ("eth_", "net_", "web3_")
+
+
 @app.post("/")
 async def main(payload: Payload) -> Result:
-    if not hasattr(eth_client, payload.method):
+    # Only expose the JSON-RPC methods, not the EthClient helpers and fields
+    if not payload.method.startswith(RPC_METHOD_PREFIXES) or not hasattr(
+        eth_client, payload.method
+    ):
         raise NotImplementedError(f"{payload.method}({','.join(payload.params or [])})")
-    return Result(
-        id=payload.id,
-        jsonrpc=payload.jsonrpc,
-        result=await getattr(eth_client, payload.method)(*(payload.params or [])),
-    )
+    result = await getattr(eth_client, payload.method)(*(payload.params or []))
+    if isinstance(result, StreamedBlock):
+        return StreamingResponse(
+            result.iter_response(payload.id, payload.jsonrpc),
+            media_type="application/json",
+        )
+    return Result(id=payload.id, jsonrpc=payload.jsonrpc, result=result)
 
 
 @app.post("/mint")
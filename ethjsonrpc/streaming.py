@@ -0,0 +1,64 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Union
+
+from fastapi.encoders import jsonable_encoder
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _dumps(content: Any) -> bytes:
+    # Same encoding as fastapi.responses.JSONResponse.render
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def stream_block_result(
+    id: Union[int, str],
+    jsonrpc: str,
+    header: dict,
+    transactions: Iterable,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encode a JSON-RPC block response chunk by chunk.
+
+    Transactions are consumed and encoded one at a time so that only the current
+    chunk (about chunk_size bytes) is held in memory, whatever the block size.
+    """
+    head = _dumps(
+        {"id": id, "jsonrpc": jsonrpc, "result": {**header, "transactions": []}}
+    )
+    # The transactions key is the last one, the encoded head ends with '[]}}'
+    buffer = bytearray(head[:-3])
+    separator = b""
+    for transaction in transactions:
+        buffer += separator + _dumps(transaction)
+        separator = b","
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]}}"
+    yield bytes(buffer)
+
+
+@dataclass
+class StreamedBlock:
+    """
+    Block result to be sent as a streamed response, see stream_block_result.
+    """
+
+    header: dict
+    transactions: Iterable
+
+    def iter_response(
+        self, id: Union[int, str], jsonrpc: str, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        return stream_block_result(
+            id, jsonrpc, self.header, self.transactions, chunk_size
+        )
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import List, Optional
+
+from eth.vm.forks.london.transactions import (
+    LondonLegacyTransaction,
+    LondonTypedTransaction,
+)
+
+logger = logging.getLogger(__name__)
+
+# Workers are started lazily from within the running server, forking this
+# multi-threaded process could leave them with a lock held forever
+MP_CONTEXT = multiprocessing.get_context("forkserver")
+
+
+@dataclass(frozen=True)
+class DecodedTransaction:
+    """
+    Plain, picklable view of a decoded EVM transaction.
+
+    py-evm transaction objects are not meant to cross process boundaries, so the
+    worker only sends back the fields the RPC actually uses.
+    """
+
+    type: int
+    sender: bytes
+    to: bytes
+    gas: int
+    gas_price: Optional[int]
+    hash: bytes
+    value: int
+    y_parity: int
+    r: int
+    s: int
+
+
+def is_legacy_tx(raw_tx: bytes) -> bool:
+    return raw_tx[0] > 0xC0
+
+
+def decode_transaction(raw_tx: bytes) -> DecodedTransaction:
+    """
+    Decode a raw RLP transaction and recover its sender.
+
+    This is CPU bound (RLP decoding + secp256k1 public key recovery) and is meant
+    to run in a worker process, see TransactionDecoder.
+    """
+    try:
+        return _decode_transaction(raw_tx)
+    except Exception as e:
+        # Decoding errors (e.g. rlp.exceptions.DecodingError) cannot always be
+        # unpickled in the parent process, which would break the whole pool
+        raise ValueError(f"Invalid transaction: {e}") from None
+
+
+def _decode_transaction(raw_tx: bytes) -> DecodedTransaction:
+    is_legacy = is_legacy_tx(raw_tx)
+    if is_legacy:
+        decoded_tx = LondonLegacyTransaction.decode(raw_tx)
+    else:
+        decoded_tx = LondonTypedTransaction.decode(raw_tx)
+    return DecodedTransaction(
+        type=0 if is_legacy else raw_tx[0],
+        sender=decoded_tx.sender,
+        to=decoded_tx.to,
+        gas=decoded_tx.gas,
+        gas_price=getattr(decoded_tx, "gas_price", None),
+        hash=decoded_tx.hash,
+        value=decoded_tx.value,
+        y_parity=decoded_tx.y_parity,
+        r=decoded_tx.r,
+        s=decoded_tx.s,
+    )
+
+
+def decode_transactions(raw_txs: List[bytes]) -> List[DecodedTransaction]:
+    return [decode_transaction(raw_tx) for raw_tx in raw_txs]
+
+
+@dataclass
+class TransactionDecoder:
+    """
+    Run transaction decoding and sender recovery in a process pool so that they
+    don't block the event loop.
+    """
+
+    executor: ProcessPoolExecutor
+    max_workers: Optional[int]
+    chunk_size: int
+
+    @staticmethod
+    def new(max_workers: Optional[int] = None, chunk_size: int = 64):
+        return TransactionDecoder(
+            ProcessPoolExecutor(max_workers, mp_context=MP_CONTEXT),
+            max_workers,
+            chunk_size,
+        )
+
+    async def _run(self, fn, *args):
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died abruptly, replace the pool so that later calls work.
+            # Concurrent calls may fail on the same pool, only replace it once.
+            if executor is self.executor:
+                logger.warning("⚠️  Transaction decoder pool broken, restarting it")
+                self.executor = ProcessPoolExecutor(
+                    self.max_workers, mp_context=MP_CONTEXT
+                )
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    async def decode(self, raw_tx: bytes) -> DecodedTransaction:
+        return await self._run(decode_transaction, bytes(raw_tx))
+
+    async def decode_many(self, raw_txs: List[bytes]) -> List[DecodedTransaction]:
+        """
+        Decode a batch of transactions (e.g. a whole block).
+
+        Transactions are sent to the workers by chunks of chunk_size to amortize
+        the inter-process overhead while still spreading the work across cores.
+        """
+        raw_txs = [bytes(raw_tx) for raw_tx in raw_txs]
+        chunks = await asyncio.gather(
+            *[
+                self._run(decode_transactions, raw_txs[i : i + self.chunk_size])
+                for i in range(0, len(raw_txs), self.chunk_size)
+            ]
+        )
+        return [decoded_tx for chunk in chunks for decoded_tx in chunk]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+from typing import Optional
+
+from starknet_py.net.client_errors import ClientError
+
+from ethjsonrpc.batching import BatchingRpcHttpClient
+
+
+def reply(request: dict) -> dict:
+    if "error" in request["params"]:
+        return {
+            "jsonrpc": "2.0",
+            "id": request["id"],
+            "error": {"code": 40, "message": request["params"]["error"]},
+        }
+    return {"jsonrpc": "2.0", "id": request["id"], "result": request["params"]}
+
+
+class FakeNodeClient(BatchingRpcHttpClient):
+    """
+    Answer batches in reverse order, without any HTTP request.
+    """
+
+    def __init__(
+        self, supports_batch=True, error: Optional[Exception] = None, **kwargs
+    ):
+        super().__init__(url="http://127.0.0.1:5050", **kwargs)
+        self.supports_batch = supports_batch
+        self.error = error
+        self.payloads = []
+        self.released = asyncio.Event()
+        self.released.set()
+
+    async def request(self, address, http_method, params=None, payload=None):
+        self.payloads.append(payload)
+        await self.released.wait()
+        if self.error is not None:
+            raise self.error
+        if not isinstance(payload, list):
+            return reply(payload)
+        if not self.supports_batch:
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32600, "message": "Invalid request"},
+            }
+        return [reply(request) for request in reversed(payload)]
+
+
+class TestBatchingRpcHttpClient(unittest.IsolatedAsyncioTestCase):
+    async def test_batches_are_flushed_at_max_batch_size(self):
+        client = FakeNodeClient(window=0.01, max_batch_size=4)
+        results = await asyncio.gather(
+            *[client.call("call", {"i": i}) for i in range(10)]
+        )
+        self.assertEqual(results, [{"i": i} for i in range(10)])
+        self.assertEqual([len(payload) for payload in client.payloads], [4, 4, 2])
+
+    async def test_lonely_call_is_not_wrapped_into_a_batch(self):
+        client = FakeNodeClient(window=0.001)
+        self.assertEqual(await client.call("call", {"i": 0}), {"i": 0})
+        self.assertEqual(
+            client.payloads,
+            [
+                {
+                    "jsonrpc": "2.0",
+                    "method": "starknet_call",
+                    "params": {"i": 0},
+                    "id": 0,
+                }
+            ],
+        )
+
+    async def test_rpc_errors_are_raised_per_call(self):
+        client = FakeNodeClient(window=0.01)
+        results = await asyncio.gather(
+            client.call("call", {"i": 0}),
+            client.call("call", {"error": "Contract error"}),
+            client.call("call", {"i": 2}),
+            return_exceptions=True,
+        )
+        self.assertEqual(results[0], {"i": 0})
+        self.assertIsInstance(results[1], ClientError)
+        self.assertEqual(results[1].code, 40)
+        self.assertEqual(results[2], {"i": 2})
+        self.assertEqual(len(client.payloads), 1)
+
+    async def test_transport_error_is_sent_to_every_caller(self):
+        error = ClientError(code="503", message="Service Unavailable")
+        client = FakeNodeClient(error=error, window=0.01)
+        results = await asyncio.gather(
+            *[client.call("call", {"i": i}) for i in range(3)],
+            return_exceptions=True,
+        )
+        self.assertEqual(results, [error] * 3)
+
+    async def test_cancelled_callers_are_skipped(self):
+        client = FakeNodeClient(window=0.01)
+        client.released.clear()
+        tasks = [asyncio.ensure_future(client.call("call", {"i": i})) for i in range(3)]
+        while not client.payloads:
+            await asyncio.sleep(0.001)
+        batch_tasks = list(client._tasks)
+        tasks[1].cancel()
+        client.released.set()
+        self.assertEqual(await tasks[0], {"i": 0})
+        self.assertEqual(await tasks[2], {"i": 2})
+        with self.assertRaises(asyncio.CancelledError):
+            await tasks[1]
+        # The batch task itself must not fail on the cancelled future
+        self.assertEqual(len(batch_tasks), 1)
+        await asyncio.gather(*batch_tasks)
+
+    async def test_falls_back_to_single_calls_without_batch_support(self):
+        client = FakeNodeClient(supports_batch=False, window=0.01)
+        results = await asyncio.gather(
+            *[client.call("call", {"i": i}) for i in range(3)]
+        )
+        self.assertEqual(results, [{"i": i} for i in range(3)])
+        self.assertFalse(client.batching)
+        self.assertIsInstance(client.payloads[0], list)
+        self.assertTrue(all(isinstance(p, dict) for p in client.payloads[1:]))
+
+        await client.call("call", {"i": 3})
+        self.assertIsInstance(client.payloads[-1], dict)
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+from starknet_py.net.client_errors import ClientError
+
+# Avoid fetching the deployments artifacts, no call is made to Kakarot here
+os.environ.setdefault("KAKAROT_ADDRESS", "0x1")
+
+from ethjsonrpc.constants import BLOCK_GAS_LIMIT, ESTIMATE_GAS_ERROR_RATIO
+from ethjsonrpc.eth_client import EthClient
+
+TX = {"from": "0xc0ffee", "to": "0xdead", "value": "0x1", "data": "0x1234"}
+
+
+class FakeEthClient(EthClient):
+    """
+    Kakarot eth_call failing with a contract error below required_gas.
+    """
+
+    def __init__(self, required_gas: int = 50_000):
+        super().__init__(None, None, None, None)
+        self.required_gas = required_gas
+        self.block_hash = 0x1
+        self.error = None
+        self.gas_limits = []
+        self.released = asyncio.Event()
+        self.released.set()
+
+    async def get_block_hash(self, block_number: str) -> int:
+        return self.block_hash
+
+    async def call_kakarot(self, tx, block_hash: int) -> bytes:
+        gas_limit = int(tx["gas_limit"], 16)
+        self.gas_limits.append(gas_limit)
+        await self.released.wait()
+        if self.error is not None:
+            raise self.error
+        if gas_limit < self.required_gas:
+            raise ClientError(code=40, message="Contract error")
+        return b""
+
+
+class TestEstimateGas(unittest.IsolatedAsyncioTestCase):
+    async def test_estimate_is_within_error_ratio(self):
+        for required_gas in [21_000, 50_000, 123_456, BLOCK_GAS_LIMIT]:
+            with self.subTest(required_gas=required_gas):
+                eth_client = FakeEthClient(required_gas)
+                estimate = int(await eth_client.eth_estimateGas(TX), 16)
+                self.assertGreaterEqual(estimate, required_gas)
+                self.assertLessEqual(
+                    (estimate - required_gas) / estimate, ESTIMATE_GAS_ERROR_RATIO
+                )
+                self.assertLessEqual(len(eth_client.gas_limits), 16)
+
+    async def test_gas_limit_is_the_upper_bound(self):
+        eth_client = FakeEthClient(50_000)
+        with self.assertRaises(ValueError):
+            await eth_client.eth_estimateGas({**TX, "gas_limit": hex(30_000)})
+        self.assertEqual(eth_client.gas_limits, [30_000])
+
+    async def test_zero_gas_limit_defaults_to_block_gas_limit(self):
+        eth_client = FakeEthClient(50_000)
+        await eth_client.eth_estimateGas({**TX, "gas_limit": "0x0"})
+        self.assertEqual(eth_client.gas_limits[0], BLOCK_GAS_LIMIT)
+
+    async def test_gas_limit_below_intrinsic_gas_is_rejected(self):
+        eth_client = FakeEthClient(50_000)
+        with self.assertRaises(ValueError):
+            await eth_client.eth_estimateGas({**TX, "gas_limit": "0x100"})
+        self.assertEqual(eth_client.gas_limits, [])
+
+    async def test_node_errors_abort_the_search_and_are_not_cached(self):
+        eth_client = FakeEthClient(50_000)
+        eth_client.error = ClientError(code="503", message="Service Unavailable")
+        with self.assertRaises(ClientError):
+            await eth_client.eth_estimateGas(TX)
+        self.assertEqual(len(eth_client.gas_limits), 1)
+        self.assertEqual(len(eth_client.estimate_gas_cache), 0)
+
+        eth_client.error = None
+        estimate = int(await eth_client.eth_estimateGas(TX), 16)
+        self.assertGreaterEqual(estimate, 50_000)
+
+    async def test_failed_searches_are_not_cached(self):
+        eth_client = FakeEthClient(BLOCK_GAS_LIMIT + 1)
+        with self.assertRaises(ValueError):
+            await eth_client.eth_estimateGas(TX)
+        self.assertEqual(len(eth_client.estimate_gas_cache), 0)
+
+    async def test_estimates_are_memoized_per_block(self):
+        eth_client = FakeEthClient(50_000)
+        estimate = await eth_client.eth_estimateGas(TX)
+        n_calls = len(eth_client.gas_limits)
+        self.assertEqual(await eth_client.eth_estimateGas(TX), estimate)
+        self.assertEqual(len(eth_client.gas_limits), n_calls)
+
+        eth_client.block_hash = 0x2
+        await eth_client.eth_estimateGas(TX)
+        self.assertEqual(len(eth_client.gas_limits), 2 * n_calls)
+
+    async def test_gas_limit_is_part_of_the_key(self):
+        eth_client = FakeEthClient(30_000)
+        await eth_client.eth_estimateGas(TX)
+        n_calls = len(eth_client.gas_limits)
+        await eth_client.eth_estimateGas({**TX, "gas_limit": hex(40_000)})
+        self.assertEqual(len(eth_client.estimate_gas_cache), 2)
+        # A new search was run, bounded by the given gas limit
+        self.assertEqual(eth_client.gas_limits[n_calls], 40_000)
+
+    async def test_concurrent_quotes_share_the_search(self):
+        eth_client = FakeEthClient(50_000)
+        await eth_client.eth_estimateGas(TX)
+        n_calls = len(eth_client.gas_limits)
+
+        eth_client = FakeEthClient(50_000)
+        eth_client.released.clear()
+        quotes = [
+            asyncio.ensure_future(eth_client.eth_estimateGas(TX)) for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        eth_client.released.set()
+        self.assertEqual(len(set(await asyncio.gather(*quotes))), 1)
+        self.assertEqual(len(eth_client.gas_limits), n_calls)
+
+    async def test_cache_is_bounded(self):
+        eth_client = FakeEthClient(50_000)
+        txs = [{**TX, "value": hex(i)} for i in range(3)]
+        with patch("ethjsonrpc.eth_client.ESTIMATE_GAS_CACHE_SIZE", 2):
+            await eth_client.eth_estimateGas(txs[0])
+            await eth_client.eth_estimateGas(txs[1])
+            # Quoting txs[0] again makes txs[1] the least recently used
+            await eth_client.eth_estimateGas(txs[0])
+            await eth_client.eth_estimateGas(txs[2])
+        self.assertEqual([key[3] for key in eth_client.estimate_gas_cache], [0, 2])
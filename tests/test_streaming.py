@@ -0,0 +1,103 @@
+import os
+import unittest
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starknet_py.net.client_models import BlockStatus, InvokeTransaction, StarknetBlock
+
+# Avoid fetching the deployments artifacts, no call is made to Kakarot here
+os.environ.setdefault("KAKAROT_ADDRESS", "0x1")
+
+from ethjsonrpc.eth_client import EthClient
+from ethjsonrpc.streaming import StreamedBlock, stream_block_result
+
+
+def get_block(n_transactions: int, transactions: bool) -> StarknetBlock:
+    return StarknetBlock(
+        block_hash=0x1,
+        parent_block_hash=0x0,
+        block_number=1,
+        status=BlockStatus.ACCEPTED_ON_L2,
+        root=0x0,
+        timestamp=0,
+        transactions=[
+            InvokeTransaction(
+                hash=i,
+                signature=[i, i],
+                max_fee=int(1e17),
+                version=1,
+                sender_address=i + 1,
+                calldata=list(range(8)),
+                nonce=i,
+            )
+            if transactions
+            else i
+            for i in range(n_transactions)
+        ],
+    )
+
+
+class TestStreamBlockResult(unittest.TestCase):
+    def setUp(self):
+        self.eth_client = EthClient(None, None, None, None)
+
+    def assert_same_body(self, block: StarknetBlock, transactions: bool, **kwargs):
+        header = self.eth_client.starknet_block_to_eth_block_header(block)
+        expected = JSONResponse(
+            jsonable_encoder(
+                {
+                    "id": 1,
+                    "jsonrpc": "2.0",
+                    "result": {
+                        **header,
+                        "transactions": list(
+                            self.eth_client.iter_eth_block_transactions(
+                                block, transactions
+                            )
+                        ),
+                    },
+                }
+            )
+        ).body
+        chunks = list(
+            stream_block_result(
+                1,
+                "2.0",
+                header,
+                self.eth_client.iter_eth_block_transactions(block, transactions),
+                **kwargs,
+            )
+        )
+        self.assertEqual(b"".join(chunks), expected)
+        return chunks
+
+    def test_same_body_as_json_response(self):
+        for transactions in [True, False]:
+            with self.subTest(transactions=transactions):
+                self.assert_same_body(get_block(10, transactions), transactions)
+
+    def test_same_body_with_small_chunks(self):
+        for transactions in [True, False]:
+            with self.subTest(transactions=transactions):
+                chunks = self.assert_same_body(
+                    get_block(10, transactions), transactions, chunk_size=16
+                )
+                self.assertGreater(len(chunks), 2)
+
+    def test_same_body_without_transactions(self):
+        for transactions in [True, False]:
+            with self.subTest(transactions=transactions):
+                self.assert_same_body(get_block(0, transactions), transactions)
+
+    def test_large_blocks_are_streamed(self):
+        block = get_block(1000, False)
+        self.assertIsInstance(
+            self.eth_client.starknet_block_to_eth_block(block, False), StreamedBlock
+        )
+        small_block = get_block(10, False)
+        self.assertEqual(
+            self.eth_client.starknet_block_to_eth_block(small_block, False)[
+                "transactions"
+            ],
+            [hex(i) for i in range(10)],
+        )
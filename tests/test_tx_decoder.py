@@ -0,0 +1,86 @@
+import os
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+import rlp
+from eth.vm.forks.london.transactions import LondonTransactionBuilder
+from eth_keys import keys
+
+from ethjsonrpc.tx_decoder import TransactionDecoder
+
+PRIVATE_KEY = keys.PrivateKey(b"\x01" * 32)
+
+
+def get_legacy_tx(nonce: int) -> bytes:
+    return rlp.encode(
+        LondonTransactionBuilder.create_unsigned_transaction(
+            nonce=nonce, gas_price=1, gas=21_000, to=b"\x02" * 20, value=1, data=b""
+        ).as_signed_transaction(PRIVATE_KEY)
+    )
+
+
+def get_dynamic_fee_tx(nonce: int) -> bytes:
+    return (
+        LondonTransactionBuilder.new_unsigned_dynamic_fee_transaction(
+            chain_id=1,
+            nonce=nonce,
+            max_priority_fee_per_gas=1,
+            max_fee_per_gas=2,
+            gas=21_000,
+            to=b"\x02" * 20,
+            value=1,
+            data=b"",
+            access_list=[],
+        )
+        .as_signed_transaction(PRIVATE_KEY)
+        .encode()
+    )
+
+
+class TestTransactionDecoder(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.decoder = TransactionDecoder.new(max_workers=2, chunk_size=2)
+
+    def tearDown(self):
+        self.decoder.shutdown()
+
+    async def test_decode(self):
+        legacy_tx = await self.decoder.decode(get_legacy_tx(0))
+        dynamic_fee_tx = await self.decoder.decode(get_dynamic_fee_tx(0))
+        self.assertEqual(legacy_tx.type, 0)
+        self.assertEqual(dynamic_fee_tx.type, 2)
+        self.assertEqual(dynamic_fee_tx.gas_price, None)
+        for decoded_tx in [legacy_tx, dynamic_fee_tx]:
+            self.assertEqual(
+                decoded_tx.sender, PRIVATE_KEY.public_key.to_canonical_address()
+            )
+
+    async def test_decode_invalid_tx_does_not_break_decoder(self):
+        for raw_tx in [bytes.fromhex("f801"), bytes.fromhex("c10102")]:
+            with self.assertRaises(ValueError):
+                await self.decoder.decode(raw_tx)
+        decoded_tx = await self.decoder.decode(get_legacy_tx(0))
+        self.assertEqual(
+            decoded_tx.sender, PRIVATE_KEY.public_key.to_canonical_address()
+        )
+
+    async def test_broken_pool_is_restarted(self):
+        with self.assertRaises(BrokenProcessPool):
+            await self.decoder._run(os._exit, 1)
+        decoded_tx = await self.decoder.decode(get_legacy_tx(0))
+        self.assertEqual(decoded_tx.type, 0)
+
+    async def test_decode_many_keeps_order_across_chunks(self):
+        raw_txs = [
+            get_legacy_tx(0),
+            get_dynamic_fee_tx(1),
+            get_legacy_tx(2),
+            get_dynamic_fee_tx(3),
+            get_legacy_tx(4),
+        ]
+        decoded_txs = await self.decoder.decode_many(raw_txs)
+        self.assertEqual([tx.type for tx in decoded_txs], [0, 2, 0, 2, 0])
+        self.assertEqual(
+            [tx.hash for tx in decoded_txs],
+            [(await self.decoder.decode(raw_tx)).hash for raw_tx in raw_txs],
+        )